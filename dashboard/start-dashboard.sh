@@ -52,7 +52,7 @@ echo "[*] Checking MySQL database connection..."
 python3 - <<EOF
 import sys
 import configparser
-import MySQLdb
+import pymysql as MySQLdb
 
 config = configparser.ConfigParser()
 config.read('$CONFIG_FILE')
@@ -97,6 +97,13 @@ echo ""
 echo "Press Ctrl+C to stop the server"
 echo ""
 
-# Start the API server
+# Start the API server under gunicorn with a gevent worker.
+# DASHBOARD_WORKERS defaults to 1: Engine.IO's polling handshake is
+# stateful and gunicorn has no sticky sessions, so with multiple workers
+# every Socket.IO client gets "Invalid session" errors (the Redis message
+# queue only fans out broadcasts, it does not route sessions). Raise the
+# worker count only behind a load balancer with session affinity.
+# (For development with auto-reload, run `python3 api.py` instead.)
+WORKERS="${DASHBOARD_WORKERS:-1}"
 cd "$SCRIPT_DIR"
-python3 api.py
+exec gunicorn -k gevent -w "$WORKERS" -b "0.0.0.0:$API_PORT" api:app
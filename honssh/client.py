@@ -105,8 +105,9 @@ class HonsshSlimClientTransport(transport.SSHClientTransport):
                         decoded = 'SSH-UNKNOWN'
                     self.gotVersion = True
                     self.ourVersionString = decoded
-                    self.factory.server.ourVersionString = self.ourVersionString
-                    log.msg(log.LBLUE, '[CLIENT]', 'Got SSH Version String: ' + self.factory.server.ourVersionString)
+                    # Store pre-encoded - every later connection reuses it
+                    self.factory.server.ourVersionString = decoded.encode('utf-8')
+                    log.msg(log.LBLUE, '[CLIENT]', 'Got SSH Version String: ' + decoded)
                     self.loseConnection()
                     break
 
@@ -27,7 +27,6 @@
 # SUCH DAMAGE.
 
 import configparser as ConfigParser
-import inspect
 
 from honssh.utils import validation
 from honssh import plugins
@@ -35,26 +34,28 @@ from honssh import plugins
 
 class Config(ConfigParser.ConfigParser):
     _instance = None
+    # Private sentinel - cheap replacement for the old inspect.stack() caller
+    # check, which walked and resolved every frame just to guard __init__
+    _create_key = object()
 
     @classmethod
     def getInstance(cls):
         if cls._instance is None:
-            cls._instance = cls()
+            cls._instance = cls(cls._create_key)
 
         return  cls._instance
 
-    def __init__(self):
-        stack = inspect.stack()
+    def __init__(self, create_key=None):
+        if create_key is not Config._create_key:
+            raise Exception('This class cannot be instantiated from outside. Please use \'getInstance()\'')
 
-        if 'cls' in stack[1][0].f_locals and stack[1][0].f_locals['cls'] is self.__class__:
-            ConfigParser.ConfigParser.__init__(self)
+        ConfigParser.ConfigParser.__init__(self)
+        self._value_cache = {}
 
-            plugin_list = plugins.get_plugin_list()
-            cfg_files = plugins.get_plugin_cfg_files(plugin_list)
-            cfg_files.append('honssh.cfg')
-            self.read(cfg_files)
-        else:
-            raise Exception('This class cannot be instantiated from outside. Please use \'getInstance()\'')
+        plugin_list = plugins.get_plugin_list()
+        cfg_files = plugins.get_plugin_cfg_files(plugin_list)
+        cfg_files.append('honssh.cfg')
+        self.read(cfg_files)
 
     def validate_config(self):
         plugin_list = plugins.get_plugin_list()
@@ -157,6 +158,14 @@ class Config(ConfigParser.ConfigParser):
         return ConfigParser.ConfigParser.get(self, section, option, raw=raw, vars=vars, fallback=fallback)
 
     def _getconv(self, prop, conv=None, default=None):
+        # Config files are only read at startup, so parsed values can be
+        # memoized instead of re-doing the lookup and conversion per call
+        cache_key = (prop[0], prop[1], conv, default)
+        try:
+            return self._value_cache[cache_key]
+        except KeyError:
+            pass
+
         if ConfigParser.ConfigParser.has_option(self, prop[0], prop[1]):
             ret = ConfigParser.ConfigParser.get(self, prop[0], prop[1], raw=False)
         else:
@@ -172,6 +181,7 @@ class Config(ConfigParser.ConfigParser):
                 log.msg(log.LYELLOW, '[CONFIG]', 'Failed to convert config value: %s' % str(e))
                 pass
 
+        self._value_cache[cache_key] = ret
         return ret
 
     def getport(self, prop, default=None):
@@ -189,7 +199,10 @@ class Config(ConfigParser.ConfigParser):
     def getboolean(self, prop, default=False):
         val = self._getconv(prop, None, default)
 
-        if val == 'true':
-            return True
-        else:
-            return False
+        if isinstance(val, bool):
+            return val
+        if isinstance(val, str):
+            # Accept the same spellings stock ConfigParser does instead of a
+            # single lowercase string compare (which also broke default=True)
+            return ConfigParser.ConfigParser.BOOLEAN_STATES.get(val.lower(), False)
+        return bool(val)
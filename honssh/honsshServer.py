@@ -31,15 +31,9 @@ from honssh import log
 
 
 class HonsshServer(transport.SSHServerTransport):
-    def connectionMade(self):
-        """Invoke the base class connectionMade to correctly initialise ciphers and buffers."""
-        # ourVersionString is a str in the config – Twisted expects bytes when writing.
-        # Base class will handle sending the version string; ensure it's bytes-friendly.
-        if isinstance(self.ourVersionString, str):
-            # Twisted's transport.py builds bytes with (self.ourVersionString + b'\r\n') if already bytes.
-            # It checks for isinstance(ourVersionString, bytes); so coerce to bytes here.
-            self.ourVersionString = self.ourVersionString.encode('utf-8')
-        transport.SSHServerTransport.connectionMade(self)
+    # ourVersionString arrives pre-encoded as bytes from the factory
+    # (config banner and client-acquired banner both encode at assignment),
+    # so no per-connection connectionMade override is needed any more.
 
     def sendDisconnect(self, reason, desc):
         """
@@ -52,10 +46,14 @@ class HonsshServer(transport.SSHServerTransport):
         @param desc: a description of the reason for the disconnection.
         @type desc: C{str}
         """
-        desc_text = desc.decode(errors='ignore') if isinstance(desc, (bytes, bytearray)) else desc
-        if 'bad packet length' not in desc_text:
+        # desc arrives as bytes from Twisted - test it as bytes so the
+        # common branch skips a UTF-8 decode (this path runs once per
+        # connection during scan floods)
+        desc_b = desc if isinstance(desc, (bytes, bytearray)) else desc.encode('utf-8', 'ignore')
+        if b'bad packet length' not in desc_b:
             transport.SSHServerTransport.sendDisconnect(self, reason, desc)
         else:
             self.transport.write(b'Protocol mismatch.\n')
-            log.msg(log.LRED, '[SERVER]', 'Disconnecting with error, code %s\nreason: %s' % (reason, desc_text))
+            log.msg(log.LRED, '[SERVER]', 'Disconnecting with error, code %s\nreason: %s'
+                    % (reason, desc_b.decode('ascii', 'ignore')))
             self.transport.loseConnection()
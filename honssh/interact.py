@@ -27,36 +27,85 @@
 # SUCH DAMAGE.
 
 import json
-import base64
+
+# SIMD-accelerated base64 (libbase64, AVX2/NEON) - falls back to the stdlib
+# implementation if unavailable, same pattern as the GeoIP/pygeoip fallback
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+# C-accelerated JSON for the per-keystroke control packets - optional,
+# with the same stdlib fallback shape as pybase64 above. Both paths
+# produce/consume bytes so callers never re-encode.
+try:
+    import orjson as _orjson
+
+    def _json_dumps(obj):
+        return _orjson.dumps(obj)
+
+    def _json_loads(data):
+        return _orjson.loads(data)
+except ImportError:
+    def _json_dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode()
+
+    def _json_loads(data):
+        return json.loads(data)
 
 from twisted.internet import protocol
+from honssh.config import Config
 from honssh import log
 
+# Evaluated once at import - config only changes on restart, and checking it
+# per packet would put two dict lookups on the keystroke path
+_DEBUG = Config.getInstance().getboolean(['devmode', 'enabled'])
+
 
 class Interact(protocol.Protocol):
     def __init__(self):
         self.interact = None
+        self._buf = bytearray()
 
     def connectionMade(self):
         pass
-           
-    def dataReceived(self, data):
-        # Normalize to str
-        if isinstance(data, bytes):
-            try:
-                data = data.decode(errors='ignore')
-            except (UnicodeDecodeError, AttributeError):
-                log.msg(log.LYELLOW, '[INTERACT]', 'Failed to decode received data')
-                data = ''
-        datagrams = data.split('_')
-        total = len(datagrams) // 3
-        for i in range(total):
-            datagram = datagrams[3 * i:(3 * i) + 3]
-            if len(datagram) == 3 and datagram[0] == 'honssh' and datagram[1] == 'c':
-                self.parsePacket(datagram[2])
+
+    def dataReceived(self, data: bytes) -> None:
+        # Frames look like honssh_c_<base64>_ and may arrive split across
+        # TCP segments, so scan a persistent buffer for complete frames
+        # instead of splitting each recv in isolation (which dropped any
+        # partial trailing frame on the floor)
+        if isinstance(data, str):
+            data = data.encode()
+        buf = self._buf
+        buf += data
+        # Bind the hot lookups once per recv - the loop runs per frame
+        find = buf.find
+        parse_packet = self.parsePacket
+        pos = 0
+        while True:
+            u1 = find(b'_', pos)
+            if u1 == -1:
+                break
+            u2 = find(b'_', u1 + 1)
+            if u2 == -1:
+                break
+            u3 = find(b'_', u2 + 1)
+            if u3 == -1:
+                # Partial frame - keep it buffered until the next recv
+                break
+            if buf[pos:u1] == b'honssh' and buf[u1 + 1:u2] == b'c':
+                # One bytearray slice per payload - b64decode (pybase64 and
+                # stdlib alike) consumes it via the buffer protocol, so no
+                # extra bytes() copy and no str decode anywhere on the path
+                parse_packet(buf[u2 + 1:u3])
             else:
                 log.msg(log.LRED, '[INTERACT]', 'Bad packet received')
                 self.transport.loseConnection()
+                del buf[:]
+                return
+            pos = u3 + 1
+        del buf[:pos]
 
     def sendData(self, the_json):
         # Accept bytes (terminal data), str, dict, list. Convert bytes -> latin1 string for 1:1 byte mapping.
@@ -65,86 +114,81 @@ class Interact(protocol.Protocol):
                 the_json = the_json.decode('latin1', 'ignore')
             # Ensure only basic JSON types
             # (If someone passes an unsupported type we fallback to an error object below)
-            payload = json.dumps(the_json, separators=(',', ':')).encode()
-            # Only log preview for structured (dict/list) responses or short strings
-            if isinstance(the_json, (dict, list)):
-                preview_src = the_json
-            elif isinstance(the_json, str) and len(the_json) <= 120:
-                preview_src = the_json
-            else:
-                preview_src = '<omitted large payload>'
-            preview = json.dumps(preview_src)[:300]
-            log.msg(log.LBLUE, '[INTERACT][DEBUG]', 'Sending response preview: ' + preview)
+            payload = _json_dumps(the_json)
+            if _DEBUG:
+                # Only log preview for structured (dict/list) responses or short strings
+                if isinstance(the_json, (dict, list)):
+                    preview_src = the_json
+                elif isinstance(the_json, str) and len(the_json) <= 120:
+                    preview_src = the_json
+                else:
+                    preview_src = '<omitted large payload>'
+                preview = _json_dumps(preview_src).decode()[:300]
+                log.msg(log.LBLUE, '[INTERACT][DEBUG]', 'Sending response preview: ' + preview)
         except (TypeError, ValueError, json.JSONDecodeError) as ex:
             err = {'msg': f'ERROR: Serialization failed: {ex.__class__.__name__}: {ex}'}
             try:
-                payload = json.dumps(err).encode()
+                payload = _json_dumps(err)
             except (TypeError, ValueError):
                 # Last resort minimal JSON
                 payload = b'{"msg":"ERROR: Serialization failed"}'
             log.msg(log.LRED, '[INTERACT][ERROR]', 'Failed to serialize response – sending error object')
-        the_data = base64.b64encode(payload).decode()
-        self.transport.write(f'honssh_s_{the_data}_'.encode())
+        self.transport.write(b'honssh_s_' + base64.b64encode(payload) + b'_')
         
-    def sendKeystroke(self, data):
-        # Data is raw bytes from terminal output. Convert & send as plain string JSON.
-        if isinstance(data, (bytes, bytearray)):
-            try:
-                data = data.decode('latin1', 'ignore')
-            except Exception:
-                data = ''
-        self.sendData(data)
+    def sendKeystroke(self, data: bytes) -> None:
+        # Terminal output goes out as raw bytes in a 'k' frame. Routing it
+        # through sendData meant latin1 decode -> JSON string -> UTF-8
+        # encode, which inflated every high-bit byte (vim, htop, colored
+        # prompts) to a multi-byte sequence; base64 over the raw bytes
+        # skips all three passes.
+        if isinstance(data, str):
+            data = data.encode('latin1', 'ignore')
+        self.transport.write(b'honssh_k_' + base64.b64encode(data) + b'_')
 
-    def getData(self, theData):
+    def getData(self, theData: bytes):
         try:
-            raw = base64.b64decode(theData)
-            return json.loads(raw.decode(errors='replace'))
+            # validate=True selects pybase64's single-pass SIMD decode path;
+            # invalid input raises binascii.Error (a ValueError subclass)
+            raw = base64.b64decode(theData, validate=True)
+            # both json.loads and orjson.loads consume bytes directly
+            return _json_loads(raw)
         except (ValueError, json.JSONDecodeError, TypeError):
             log.msg(log.LYELLOW, '[INTERACT]', 'Failed to decode malformed packet')
             return {'msg': 'ERROR: Malformed packet'}
 
-    def parsePacket(self, theData):
+    def parsePacket(self, theData: bytes) -> None:
         the_json = self.getData(theData)
         if not self.interact:
             the_command = the_json.get('command')
             if the_command:
                 if the_command == 'list':
                     raw_list = self.factory.connections.return_connections()
-                    try:
-                        log.msg(log.LBLUE, '[INTERACT][DEBUG]', 'List request: sensors=%s session_counts=%s' % (
-                            len(raw_list), [len(s.get('sessions', [])) for s in raw_list]))
-                    except (KeyError, TypeError, AttributeError):
-                        log.msg(log.LYELLOW, '[INTERACT]', 'Failed to log list request debug info')
-                    safe_list = []
-                    for sensor in raw_list:
-                        safe_sensor = {
-                            'sensor_name': sensor.get('sensor_name'),
-                            'honey_ip': sensor.get('honey_ip'),
-                            'honey_port': sensor.get('honey_port'),
-                            'sessions': []
-                        }
-                        for session in sensor.get('sessions', []):
-                            safe_session = {
-                                'session_id': session.get('session_id'),
-                                'peer_ip': session.get('peer_ip'),
-                                'peer_port': session.get('peer_port'),
-                                'start_time': session.get('start_time'),
-                                'end_time': session.get('end_time') if 'end_time' in session else None,
-                                'channels': []
-                            }
-                            for channel in session.get('channels', []):
-                                safe_channel = {
-                                    'uuid': channel.get('uuid'),
-                                    'name': channel.get('name'),
-                                    'start_time': channel.get('start_time')
-                                }
-                                if 'end_time' in channel:
-                                    # Only include end_time if the channel actually closed; absence signals active
-                                    safe_channel['end_time'] = channel.get('end_time')
-                                safe_session['channels'].append(safe_channel)
-                            safe_sensor['sessions'].append(safe_session)
-                        safe_list.append(safe_sensor)
-                    if len(safe_list) == 0:
+                    if _DEBUG:
+                        log.msg(log.LBLUE, '[INTERACT][DEBUG]', 'List request: sensors=%s' % len(raw_list))
+                    # Comprehensions with dict literals compile to
+                    # BUILD_MAP/LIST_APPEND - cheaper than append loops for
+                    # UIs polling 'list' frequently. end_time is only
+                    # included for channels that actually closed; absence
+                    # signals active.
+                    safe_list = [{
+                        'sensor_name': sensor.get('sensor_name'),
+                        'honey_ip': sensor.get('honey_ip'),
+                        'honey_port': sensor.get('honey_port'),
+                        'sessions': [{
+                            'session_id': session.get('session_id'),
+                            'peer_ip': session.get('peer_ip'),
+                            'peer_port': session.get('peer_port'),
+                            'start_time': session.get('start_time'),
+                            'end_time': session.get('end_time') if 'end_time' in session else None,
+                            'channels': [{
+                                'uuid': channel.get('uuid'),
+                                'name': channel.get('name'),
+                                'start_time': channel.get('start_time'),
+                                **({'end_time': channel['end_time']} if 'end_time' in channel else {})
+                            } for channel in session.get('channels', ())]
+                        } for session in sensor.get('sessions', ())]
+                    } for sensor in raw_list]
+                    if _DEBUG and len(safe_list) == 0:
                         log.msg(log.LBLUE, '[INTERACT][DEBUG]', 'Sending empty session list')
                     self.sendData(safe_list)
                 elif the_command in ['view', 'interact', 'disconnect']:
@@ -45,6 +45,24 @@ LCYAN = '\033[1;36m'
 
 cfg = Config.getInstance()
 
+# Devmode only changes on restart; resolving it per log call costs two
+# config lookups on paths that log every keystroke
+_DEVMODE = cfg.has_option('devmode', 'enabled') and cfg.getboolean(['devmode', 'enabled'])
+
+# (color, identifier) -> ready-made line prefix. The identifier set is
+# small and fixed, so each log line costs one dict hit instead of
+# reassembling the same prefix thousands of times per second
+_PREFIX_CACHE = {}
+
+
+def is_enabled(identifier=''):
+    """True if msg() would emit a message tagged with identifier.
+
+    Lets hot paths check once and skip building format strings entirely:
+    DEBUG-tagged categories are devmode-only, everything else always logs.
+    """
+    return _DEVMODE or not identifier.endswith('[DEBUG]')
+
 
 def msg(*args):
     """Unified logging helper.
@@ -57,6 +75,9 @@ def msg(*args):
     """
     if len(args) == 3:
         color, identifier, message = args
+        # DEBUG lines are devmode-only; drop them before any formatting
+        if not _DEVMODE and identifier.endswith('[DEBUG]'):
+            return
     elif len(args) == 1:
         color = ''
         identifier = '[HONSSH]'
@@ -69,8 +90,14 @@ def msg(*args):
     if not isinstance(message, str):
         message = repr(message)
 
-    # When devmode enabled include color codes (if provided)
-    if cfg.has_option('devmode', 'enabled') and cfg.getboolean(['devmode', 'enabled']):
-        twisted_log.msg(color + identifier + ' - ' + message + '\033[0m')
+    key = (color, identifier)
+    prefix = _PREFIX_CACHE.get(key)
+    if prefix is None:
+        # When devmode enabled include color codes (if provided)
+        prefix = (color + identifier + ' - ') if _DEVMODE else (identifier + ' - ')
+        _PREFIX_CACHE[key] = prefix
+
+    if _DEVMODE:
+        twisted_log.msg(prefix + message + '\033[0m')
     else:
-        twisted_log.msg(identifier + ' - ' + message)
+        twisted_log.msg(prefix + message)
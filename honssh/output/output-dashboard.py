@@ -10,8 +10,25 @@ from honssh import log
 import datetime
 import time
 import json
-import requests
-from threading import Thread
+import queue
+from io import BytesIO
+
+# C-accelerated JSON for event payloads, stdlib fallback as in
+# honssh/interact.py - both return bytes ready for the request body
+try:
+    import orjson as _orjson
+
+    def _json_dumps(obj):
+        return _orjson.dumps(obj)
+except ImportError:
+    def _json_dumps(obj):
+        return json.dumps(obj).encode()
+
+from twisted.internet import reactor, task
+from twisted.web.client import Agent, HTTPConnectionPool, FileBodyProducer, readBody
+from twisted.web.http_headers import Headers
+
+_JSON_HEADERS = Headers({b'Content-Type': [b'application/json']})
 
 
 class Plugin(object):
@@ -19,12 +36,21 @@ class Plugin(object):
     Dashboard plugin for real-time updates to HonSSH Dashboard
     Sends events via HTTP POST to the dashboard API
     """
-    
+
+    __slots__ = ('cfg', 'dashboard_url', 'enabled', '_agent', '_pool',
+                 '_queue', '_batch_supported', '_batch_url', '_urls')
+
     def __init__(self):
         self.cfg = Config.getInstance()
         self.dashboard_url = None
         self.enabled = False
-        
+        self._agent = None
+        self._pool = None
+        self._queue = None
+        self._batch_supported = True
+        self._batch_url = None
+        self._urls = {}
+
     def start_server(self):
         """Initialize dashboard connection"""
         if self.cfg.getboolean(['output-dashboard', 'enabled']):
@@ -32,38 +58,97 @@ class Plugin(object):
             host = self.cfg.get(['output-dashboard', 'api_host'])
             port = self.cfg.get(['output-dashboard', 'api_port'])
             self.dashboard_url = f"http://{host}:{port}"
+            self._batch_url = f"{self.dashboard_url}/api/events/batch".encode()
+            # The event-type set is fixed, so build the per-event URLs once
+            # instead of formatting one per send. Agent wants bytes.
+            self._urls = {e: f"{self.dashboard_url}/api/events/{e}".encode() for e in (
+                'connection_made', 'connection_lost', 'client_identified',
+                'login_success', 'login_failed', 'channel_opened',
+                'channel_closed', 'command_executed', 'download_started',
+                'download_completed')}
+            # HonSSH runs on the Twisted reactor already, so deliver events
+            # with a pooled Agent instead of blocking requests on worker
+            # threads - no thread per event, persistent connections for free
+            self._pool = HTTPConnectionPool(reactor, persistent=True)
+            self._pool.maxPersistentPerHost = 4
+            self._agent = Agent(reactor, pool=self._pool)
+            self._queue = queue.SimpleQueue()
+            task.LoopingCall(self._flush).start(0.1, now=False)
             log.msg(log.LGREEN, '[PLUGIN][DASHBOARD]', f'Dashboard integration enabled: {self.dashboard_url}')
-        
+
     def set_server(self, server):
         """Set server reference"""
         pass
-    
+
+    def _flush(self):
+        """Reactor-side tick draining queued events into one batched POST"""
+        batch = []
+        try:
+            while len(batch) < 256:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        if not batch:
+            return
+        if self._batch_supported:
+            payload = [{'event': event_type, 'data': data} for event_type, data in batch]
+            d = self._post(self._batch_url, payload)
+            d.addCallback(self._check_batch_response, batch)
+        else:
+            for event_type, data in batch:
+                self._post_event(event_type, data)
+
+    def _post(self, url, obj):
+        """Fire a JSON POST on the reactor; delivery failures are silent
+        (the dashboard might simply not be running)"""
+        body = FileBodyProducer(BytesIO(_json_dumps(obj)))
+        d = self._agent.request(b'POST', url, _JSON_HEADERS, body)
+        d.addErrback(lambda failure: None)
+        return d
+
+    def _check_batch_response(self, response, batch):
+        if response is None:
+            return
+        # Drain the body so the pooled connection can be reused
+        readBody(response).addErrback(lambda failure: None)
+        if response.code == 404:
+            # Older dashboard without the batch endpoint - resend this
+            # batch through the per-event URLs and stay there
+            self._batch_supported = False
+            for event_type, data in batch:
+                self._post_event(event_type, data)
+        elif response.code != 200:
+            log.msg(log.LYELLOW, '[PLUGIN][DASHBOARD]',
+                   f'Warning: Dashboard returned {response.code}')
+
+    def _post_event(self, event_type, data):
+        """Single-event fallback path"""
+        url = self._urls.get(event_type) or f"{self.dashboard_url}/api/events/{event_type}".encode()
+        d = self._post(url, data)
+        d.addCallback(self._check_event_response)
+
+    def _check_event_response(self, response):
+        if response is None:
+            return
+        readBody(response).addErrback(lambda failure: None)
+        if response.code != 200:
+            log.msg(log.LYELLOW, '[PLUGIN][DASHBOARD]',
+                   f'Warning: Dashboard returned {response.code}')
+
     def _send_event(self, event_type, data):
-        """Send event to dashboard API asynchronously"""
+        """Queue event for delivery to the dashboard API.
+
+        Hooks run on the reactor thread pool (deferToThread), so events go
+        through a thread-safe queue and the reactor-side flush tick.
+        """
         if not self.enabled:
             return
-            
-        def send():
-            try:
-                url = f"{self.dashboard_url}/api/events/{event_type}"
-                response = requests.post(url, json=data, timeout=5)
-                if response.status_code != 200:
-                    log.msg(log.LYELLOW, '[PLUGIN][DASHBOARD]', 
-                           f'Warning: Dashboard returned {response.status_code}')
-            except requests.exceptions.ConnectionError:
-                # Dashboard might not be running, fail silently
-                pass
-            except Exception as e:
-                log.msg(log.LYELLOW, '[PLUGIN][DASHBOARD]', 
-                       f'Error sending event: {str(e)}')
-        
-        # Send asynchronously to not block HonSSH
-        thread = Thread(target=send)
-        thread.daemon = True
-        thread.start()
+        self._queue.put((event_type, data))
     
     def connection_made(self, sensor):
         """Called when a new connection is established"""
+        if not self.enabled:
+            return
         session = sensor['session']
         self._send_event('connection_made', {
             'session_id': session['session_id'],
@@ -78,6 +163,8 @@ class Plugin(object):
     
     def connection_lost(self, sensor):
         """Called when connection is closed"""
+        if not self.enabled:
+            return
         session = sensor['session']
         self._send_event('connection_lost', {
             'session_id': session['session_id'],
@@ -88,6 +175,8 @@ class Plugin(object):
     
     def set_client(self, sensor):
         """Called when client version is identified"""
+        if not self.enabled:
+            return
         session = sensor['session']
         self._send_event('client_identified', {
             'session_id': session['session_id'],
@@ -97,6 +186,8 @@ class Plugin(object):
     
     def login_successful(self, sensor):
         """Called on successful authentication"""
+        if not self.enabled:
+            return
         session = sensor['session']
         auth = session.get('auth', {})
         self._send_event('login_success', {
@@ -104,6 +195,7 @@ class Plugin(object):
             'peer_ip': session['peer_ip'],
             'username': auth.get('username', ''),
             'password': auth.get('password', ''),
+            'success': True,
             'timestamp': auth.get('date_time', '')
         })
         log.msg(log.LGREEN, '[PLUGIN][DASHBOARD]', 
@@ -111,6 +203,8 @@ class Plugin(object):
     
     def login_failed(self, sensor):
         """Called on failed authentication"""
+        if not self.enabled:
+            return
         session = sensor['session']
         auth = session.get('auth', {})
         self._send_event('login_failed', {
@@ -118,11 +212,14 @@ class Plugin(object):
             'peer_ip': session['peer_ip'],
             'username': auth.get('username', ''),
             'password': auth.get('password', ''),
+            'success': False,
             'timestamp': auth.get('date_time', '')
         })
     
     def channel_opened(self, sensor):
         """Called when a channel is opened"""
+        if not self.enabled:
+            return
         session = sensor['session']
         channel = session.get('channel', {})
         self._send_event('channel_opened', {
@@ -134,6 +231,8 @@ class Plugin(object):
     
     def channel_closed(self, sensor):
         """Called when a channel is closed"""
+        if not self.enabled:
+            return
         session = sensor['session']
         channel = session.get('channel', {})
         self._send_event('channel_closed', {
@@ -144,6 +243,8 @@ class Plugin(object):
     
     def command_entered(self, sensor):
         """Called when a command is executed"""
+        if not self.enabled:
+            return
         session = sensor['session']
         channel = session.get('channel', {})
         command = channel.get('command', {})
@@ -160,6 +261,8 @@ class Plugin(object):
     
     def download_started(self, sensor):
         """Called when file download starts"""
+        if not self.enabled:
+            return
         session = sensor['session']
         channel = session.get('channel', {})
         download = channel.get('download', {})
@@ -173,6 +276,8 @@ class Plugin(object):
     
     def download_finished(self, sensor):
         """Called when file download completes"""
+        if not self.enabled:
+            return
         session = sensor['session']
         channel = session.get('channel', {})
         download = channel.get('download', {})
@@ -42,6 +42,8 @@ class Plugin(object):
         self.cfg = Config.getInstance()
         self.server = None
         self._schema_checked = False
+        self._rollup_checked = False
+        self._indexes_checked = False
 
     def connect_dbserver(self):
         db = MySQLdb.connect(
@@ -71,6 +73,9 @@ class Plugin(object):
             cursor.execute("SHOW COLUMNS FROM `auth` LIKE 'country'")
             has_country = cursor.fetchone() is not None
 
+            cursor.execute("SHOW COLUMNS FROM `auth` LIKE 'sessionid'")
+            has_sessionid = cursor.fetchone() is not None
+
             altered = False
 
             if not has_ip:
@@ -85,6 +90,25 @@ class Plugin(object):
                 )
                 altered = True
 
+            if not has_sessionid:
+                cursor.execute(
+                    "ALTER TABLE `auth` ADD COLUMN `sessionid` CHAR(32) NULL DEFAULT NULL AFTER `timestamp`"
+                )
+                cursor.execute(
+                    "ALTER TABLE `auth` ADD INDEX `ix_auth_sessionid` (`sessionid`)"
+                )
+                # Link existing auth rows to their sessions so the dashboard's
+                # session-details view gets an index lookup instead of a
+                # timestamp range scan over the whole auth table
+                cursor.execute(
+                    "UPDATE `auth` a JOIN `sessions` s "
+                    "ON a.`ip` = s.`ip` "
+                    "AND a.`timestamp` BETWEEN s.`starttime` AND COALESCE(s.`endtime`, NOW()) "
+                    "SET a.`sessionid` = s.`id` "
+                    "WHERE a.`sessionid` IS NULL"
+                )
+                altered = True
+
             if altered:
                 server.commit()
                 log.msg(log.LGREEN, '[PLUGIN][MYSQL]', 'Auth table schema updated with IP/Country columns')
@@ -102,6 +126,98 @@ class Plugin(object):
             if server:
                 server.close()
 
+    def ensure_dashboard_indexes(self):
+        """Add the indexes the dashboard's sort/filter queries rely on.
+
+        Existing installs created from older honssh.sql lack them, which
+        turns the 'recent' endpoints into full scans with a filesort.
+        """
+        if self._indexes_checked:
+            return
+
+        indexes = [
+            ('auth', 'ix_auth_success_ts', '`success`, `timestamp`'),
+            ('sessions', 'ix_sessions_ip', '`ip`'),
+            ('downloads', 'ix_downloads_ts', '`timestamp`'),
+            ('channels', 'ix_channels_sessionid', '`sessionid`'),
+            ('commands', 'ix_commands_channelid', '`channelid`'),
+        ]
+
+        try:
+            for table, name, columns in indexes:
+                rows = self.select(
+                    'SELECT 1 FROM information_schema.statistics '
+                    'WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s '
+                    'LIMIT 1', (table, name))
+                if not rows:
+                    self.insert('ALTER TABLE `%s` ADD INDEX `%s` (%s)' % (table, name, columns))
+                    log.msg(log.LGREEN, '[PLUGIN][MYSQL]', 'Added index %s on %s' % (name, table))
+            self._indexes_checked = True
+        except Exception as e:
+            log.msg(log.LYELLOW, '[PLUGIN][MYSQL]', f'Unable to ensure dashboard indexes: {e}')
+
+    def ensure_rollup_schema(self):
+        if self._rollup_checked:
+            return
+
+        try:
+            self.insert(
+                'CREATE TABLE IF NOT EXISTS `auth_hourly` ('
+                '`hour_start` DATETIME NOT NULL, '
+                '`attempts` INT(11) NOT NULL DEFAULT 0, '
+                '`successes` INT(11) NOT NULL DEFAULT 0, '
+                'PRIMARY KEY (`hour_start`))'
+            )
+            self.insert(
+                'CREATE TABLE IF NOT EXISTS `sessions_hourly` ('
+                '`hour_start` DATETIME NOT NULL, '
+                '`sessions` INT(11) NOT NULL DEFAULT 0, '
+                'PRIMARY KEY (`hour_start`))'
+            )
+
+            # Backfill empty rollups from the raw tables so the dashboard
+            # timeline covers pre-deploy history - without this it would
+            # switch to rollup-only data as soon as the first live event
+            # lands and silently drop every earlier day
+            if not self.select('SELECT 1 FROM `auth_hourly` LIMIT 1'):
+                self.insert(
+                    'INSERT INTO `auth_hourly` (`hour_start`, `attempts`, `successes`) '
+                    'SELECT FROM_UNIXTIME(FLOOR(UNIX_TIMESTAMP(`timestamp`) / 3600) * 3600) AS `hour_start`, '
+                    'COUNT(*), SUM(`success`) '
+                    'FROM `auth` GROUP BY `hour_start`'
+                )
+                log.msg(log.LGREEN, '[PLUGIN][MYSQL]', 'Backfilled auth_hourly rollup from auth table')
+            if not self.select('SELECT 1 FROM `sessions_hourly` LIMIT 1'):
+                self.insert(
+                    'INSERT INTO `sessions_hourly` (`hour_start`, `sessions`) '
+                    'SELECT FROM_UNIXTIME(FLOOR(UNIX_TIMESTAMP(`starttime`) / 3600) * 3600) AS `hour_start`, '
+                    'COUNT(*) '
+                    'FROM `sessions` GROUP BY `hour_start`'
+                )
+                log.msg(log.LGREEN, '[PLUGIN][MYSQL]', 'Backfilled sessions_hourly rollup from sessions table')
+
+            self._rollup_checked = True
+        except Exception as e:
+            log.msg(log.LYELLOW, '[PLUGIN][MYSQL]', f'Unable to ensure rollup schema: {e}')
+
+    def update_auth_hourly(self, timestamp_unix, success):
+        """Maintain the per-hour auth rollup the dashboard timeline reads from"""
+        self.ensure_rollup_schema()
+        self.insert(
+            'INSERT INTO `auth_hourly` (`hour_start`, `attempts`, `successes`) VALUES '
+            '(FROM_UNIXTIME(FLOOR(%s / 3600) * 3600), 1, %s) '
+            'ON DUPLICATE KEY UPDATE `attempts` = `attempts` + 1, `successes` = `successes` + VALUES(`successes`)',
+            (timestamp_unix, 1 if success else 0))
+
+    def update_sessions_hourly(self, timestamp_unix):
+        """Maintain the per-hour session rollup the dashboard timeline reads from"""
+        self.ensure_rollup_schema()
+        self.insert(
+            'INSERT INTO `sessions_hourly` (`hour_start`, `sessions`) VALUES '
+            '(FROM_UNIXTIME(FLOOR(%s / 3600) * 3600), 1) '
+            'ON DUPLICATE KEY UPDATE `sessions` = `sessions` + 1',
+            (timestamp_unix,))
+
     def connection_lost(self, sensor):
         session = sensor['session']
         self.insert('UPDATE `sessions` SET `endtime` = FROM_UNIXTIME(%s) WHERE `id` = %s',
@@ -109,15 +225,19 @@ class Plugin(object):
 
     def login_successful(self, sensor):
         self.ensure_auth_schema()
+        self.ensure_dashboard_indexes()
         auth = sensor['session']['auth']
         session_data = sensor['session']
         attacker_ip = auth.get('ip', session_data.get('peer_ip', ''))
         country = auth.get('country', session_data.get('country', ''))
 
         self.insert(
-            'INSERT INTO `auth` (`success`, `username`, `password`, `ip`, `country`, `timestamp`) VALUES '
-            '(%s, %s, %s, %s, %s, FROM_UNIXTIME(%s))',
-            (1, auth['username'], auth['password'], attacker_ip, country, self.now_unix(auth['date_time'])))
+            'INSERT INTO `auth` (`success`, `username`, `password`, `ip`, `country`, `timestamp`, `sessionid`) VALUES '
+            '(%s, %s, %s, %s, %s, FROM_UNIXTIME(%s), %s)',
+            (1, auth['username'], auth['password'], attacker_ip, country, self.now_unix(auth['date_time']),
+             session_data['session_id']))
+
+        self.update_auth_hourly(self.now_unix(auth['date_time']), True)
 
         log.msg(
             log.LBLUE,
@@ -132,20 +252,26 @@ class Plugin(object):
             'INSERT INTO `sessions` (`id`, `starttime`, `sensor`, `ip`, `port`) VALUES (%s, FROM_UNIXTIME(%s), %s, %s, %s)',
             (session['session_id'], self.now_unix(session['start_time']), id, session['peer_ip'], session['peer_port']))
 
+        self.update_sessions_hourly(self.now_unix(session['start_time']))
+
         id = self.insert_client(session)
         self.insert('UPDATE `sessions` SET `client` = %s WHERE `id` = %s', (id, session['session_id']))
 
     def login_failed(self, sensor):
         self.ensure_auth_schema()
+        self.ensure_dashboard_indexes()
         auth = sensor['session']['auth']
         session_data = sensor['session']
         attacker_ip = auth.get('ip', session_data.get('peer_ip', ''))
         country = auth.get('country', session_data.get('country', ''))
 
         self.insert(
-            'INSERT INTO `auth` (`success`, `username`, `password`, `ip`, `country`, `timestamp`) VALUES '
-            '(%s, %s, %s, %s, %s, FROM_UNIXTIME(%s))',
-            (0, auth['username'], auth['password'], attacker_ip, country, self.now_unix(auth['date_time'])))
+            'INSERT INTO `auth` (`success`, `username`, `password`, `ip`, `country`, `timestamp`, `sessionid`) VALUES '
+            '(%s, %s, %s, %s, %s, FROM_UNIXTIME(%s), %s)',
+            (0, auth['username'], auth['password'], attacker_ip, country, self.now_unix(auth['date_time']),
+             session_data['session_id']))
+
+        self.update_auth_hourly(self.now_unix(auth['date_time']), False)
 
         log.msg(
             log.LBLUE,
@@ -27,18 +27,23 @@
 # SUCH DAMAGE.
 
 from honssh import log
-from twisted.internet import threads
+from twisted.internet import task, threads
 from honssh.config import Config
 from honssh import plugins
 from kippo.core import ttylog
 
-import datetime
+import collections
+import functools
 import time
 import os
+import queue
 import re
+import struct
+import threading
 import uuid
 import getopt
 import hashlib
+import ipaddress
 import socket
 # urllib handled dynamically with urllib.request inside download_file for Py3 compatibility
 """GeoIP loading strategy:
@@ -46,6 +51,48 @@ import socket
 2. Fallback to pygeoip (pure python) if installed, probing common database locations
 3. If neither available or no database found, country lookup returns '' silently (once logs a notice)
 """
+# Tokenizers and wget getopt spec for command_entered, built once at import
+# instead of per attacker-entered command
+# Newline sits in the separator class so one findall pass yields the fully
+# split command list - no second split('\n') sweep over every token
+_CMD_SPLIT_RE = re.compile(r'(?:[^;&|<>()"\'\n]|["\'](?:\\.|[^"\'])*[\'"])+')
+_WGET_ARG_RE = re.compile(r'(?:[^\s"]|"(?:\\.|[^"])*")+')
+_WGET_SHORT = 'VhbdqvFcNS46xErkKmpHLnp:e:o:a:i:B:t:O:T:w:Q:P:U:l:A:R:D:I:X:'
+_WGET_LONG = ('version', 'help', 'background', 'execute=', 'output-file=',
+              'append-output=', 'debug', 'quiet', 'verbose', 'report-speed=',
+              'input-file=', 'force-html', 'base=', 'config=', 'bind-address=',
+              'tries=', 'output-document=', 'backups=', 'continue', 'progress=',
+              'timestamping', 'no-use-server-timestamps', 'server-response',
+              'spider', 'timeout=', 'dns-timeout=', 'connect-timeout=',
+              'read-timeout=', 'limit-rate=', 'wait=', 'waitretry=', 'random-wait',
+              'no-proxy', 'quota=', 'no-dns-cache', 'restrict-file-names=',
+              'inet4-only', 'inet6-only', 'prefer-family=', 'retry-connrefused',
+              'user=', 'password=', 'ask-password', 'no-iri', 'local-encoding=',
+              'remote-encoding=', 'unlink', 'force-directories',
+              'protocol-directories', 'cut-dirs=', 'directory-prefix=',
+              'default-page=', 'adjust-extension', 'http-user=', 'http-password=',
+              'no-http-keep-alive', 'no-cache', 'no-cookies', 'load-cookies=',
+              'save-cookies=', 'keep-session-cookies', 'ignore-length', 'header=',
+              'max-redirect=', 'proxy-user=', 'proxy-password=', 'referer=',
+              'save-headers', 'user-agent=', 'post-data=', 'post-file=', 'method=',
+              'body-data=', 'body-file=', 'content-disposition', 'content-on-error',
+              'trust-server-names', 'auth-no-challenge', 'secure-protocol=',
+              'https-only', 'no-check-certificate', 'certificate=',
+              'certificate-type=', 'private-key=', 'private-key-type=',
+              'ca-certificate=', 'ca-directory=', 'random-file=', 'egd-file=',
+              'warc-file=', 'warc-header=', 'warc-max-size=', 'warc-cdx',
+              'warc-dedup=', 'no-warc-compression', 'no-warc-digests',
+              'no-warc-keep-log', 'warc-tempdir=', 'ftp-user=', 'ftp-password=',
+              'no-remove-listing', 'no-glob', 'no-passive-ftp',
+              'preserve-permissions', 'retr-symlinks', 'recursive', 'level=',
+              'delete-after', 'convert-links', 'backup-converted', 'mirror',
+              'page-requisites', 'strict-comments', 'accept=', 'reject=',
+              'accept-regex=', 'reject-regex=', 'regex-type=', 'domains=',
+              'exclude-domains=', 'follow-ftp', 'follow-tags=', 'ignore-tags=',
+              'ignore-case', 'span-hosts', 'relative', 'include-directories=',
+              'exclude-directories=', 'no-verbose', 'no-clobber', 'no-directories',
+              'no-host-directories', 'no-parent')
+
 _geoip_obj = None
 _geoip_notice_logged = False
 try:  # Legacy binding
@@ -66,7 +113,10 @@ except ImportError:  # pragma: no cover
         for _p in _GEOIP_PATH_CANDIDATES:
             if os.path.exists(_p):
                 try:
-                    _geoip_obj = pygeoip.GeoIP(_p)
+                    # MEMORY_CACHE mirrors the legacy binding above: load the
+                    # whole database up front instead of seeking the file on
+                    # every lookup
+                    _geoip_obj = pygeoip.GeoIP(_p, pygeoip.MEMORY_CACHE)
                     break
                 except Exception:
                     pass
@@ -74,6 +124,150 @@ except ImportError:  # pragma: no cover
         pass
 
 
+@functools.lru_cache(maxsize=4096)
+def _cname_cached(ipv4_str):
+    """Memoized country lookup - scanners reconnect from the same addresses
+    for hours, so most lookups after the first are cache hits."""
+    try:
+        # Private/loopback/link-local sources (lab traffic, internal scans)
+        # can never resolve to a country - skip the database walk entirely
+        if not ipaddress.ip_address(ipv4_str).is_global:
+            return ''
+    except ValueError:
+        return ''
+    try:
+        if hasattr(_geoip_obj, 'country_name_by_addr'):
+            return _geoip_obj.country_name_by_addr(ipv4_str) or ''
+    except (ValueError, TypeError, AttributeError):
+        # Invalid IP or GeoIP lookup error
+        return ''
+    return ''
+
+
+# Cached whole-second prefix for get_date_time: [epoch_second, formatted_prefix].
+# The strftime work is invariant within a wall-clock second, so only the
+# microsecond tail needs formatting per event.
+_last_second = [0, '']
+
+
+def _get_date_time():
+    t = time.time()
+    s = int(t)
+    us = int((t - s) * 1000000)
+    if s != _last_second[0]:
+        _last_second[:] = [s, time.strftime('%Y%m%d_%H%M%S_', time.localtime(s))]
+    return _last_second[1] + '%06d' % us
+
+
+# Max records drained per wakeup of the ttylog writer thread
+_TTYLOG_BATCH = 256
+
+
+class _TtylogWriter(object):
+    """Single background thread draining tty records off the reactor.
+
+    input_tty/output_tty/interact_tty used to issue a blocking open+write
+    syscall pair per keystroke on the reactor thread, which serialises the
+    whole event loop on disk I/O during busy scans. Records now queue here
+    and the writer batches them into one write per file per drain.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue(maxsize=65536)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, ttylog_file, direction, stamp, data):
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait((ttylog_file, direction, stamp, data, None))
+        except queue.Full:
+            # Bounded on purpose: fall back to a synchronous write rather
+            # than growing without limit when the disk cannot keep up
+            ttylog.ttylog_write(ttylog_file, len(data), direction, stamp, data)
+
+    def flush(self, ttylog_file):
+        """Block until every record queued so far for ttylog_file is on disk."""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put((ttylog_file, None, None, b'', done))
+        done.wait(timeout=5.0)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                thread = threading.Thread(target=self._writer_loop, name='ttylog-writer', daemon=True)
+                thread.start()
+                self._thread = thread
+
+    def _writer_loop(self):
+        # Reused scratch buffer: headers are packed in place and payloads
+        # copied in once, so a batch costs a single allocation-free append
+        # per file instead of one bytes concatenation per record plus a join
+        scratch = bytearray(1 << 20)
+        pack_into = struct.pack_into
+        while True:
+            records = [self._queue.get()]
+            try:
+                while len(records) < _TTYLOG_BATCH:
+                    records.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            by_file = {}
+            events = []
+            for ttylog_file, direction, stamp, data, done in records:
+                if done is not None:
+                    events.append(done)
+                    continue
+                by_file.setdefault(ttylog_file, []).append((direction, stamp, data))
+
+            for ttylog_file, file_records in by_file.items():
+                need = sum(24 + len(data) for _, _, data in file_records)
+                if need > len(scratch):
+                    scratch = bytearray(need)
+                mv = memoryview(scratch)
+                off = 0
+                for direction, stamp, data in file_records:
+                    sec = int(stamp)
+                    usec = int(1000000 * (stamp - sec))
+                    pack_into('<iLiiLL', scratch, off, ttylog.OP_WRITE, 0, len(data), direction, sec, usec)
+                    off += 24
+                    end = off + len(data)
+                    mv[off:end] = data
+                    off = end
+                fd = ttylog._peek_fd(ttylog_file)
+                if fd is None:
+                    # The log was closed (flush timed out before we drained
+                    # these records); reopening it via _get_fd would append
+                    # past the CLOSE marker and leak an fd, so drop them
+                    log.msg(log.LRED, '[OUTPUT]',
+                            'dropping %d late tty records for closed log %s'
+                            % (len(file_records), ttylog_file))
+                    continue
+                try:
+                    # One append per file per batch on the fd ttylog keeps
+                    # open for the session - no open/close churn here either
+                    os.write(fd, mv[:off])
+                except OSError as ex:
+                    log.msg(log.LRED, '[OUTPUT]', 'ttylog write failed for %s: %s' % (ttylog_file, ex))
+            # Set flush events only after their preceding records hit disk
+            for done in events:
+                done.set()
+
+
+_ttylog_writer = _TtylogWriter()
+# Pre-bound method so the per-keystroke path skips two attribute lookups
+_ttylog_submit = _ttylog_writer.submit
+
+# Cap on simultaneous malware downloads across all sessions. Must stay
+# below the reactor threadpool size (8, set in honssh.tac) or stalled
+# downloads can still occupy every worker and starve plugin dispatch.
+_download_sem = threading.BoundedSemaphore(4)
+
+
 class Output(object):
     def __init__(self, factory):
         self.cfg = Config.getInstance()
@@ -88,8 +282,24 @@ class Output(object):
         self.session_id = None
         self.logLocation = None
         self.downloadFolder = None
-        # Buffer early handshake packets if packet logging enabled but session not initialised yet
-        self._early_packets = []
+        self._session_folder_made = False
+        self._downloads_folder_made = False
+        # Resolved once - the config tree never changes at runtime
+        self._user_agent = (self.cfg.get(['download', 'user_agent'])
+                            if self.cfg.has_option('download', 'user_agent') else '') or 'Wget/1.21.1'
+        # Verbosity flags cached so silent categories skip string formatting
+        self._verbose = log.is_enabled('[CONN]')
+        self._debug = log.is_enabled('[OUTPUT][DEBUG]')
+        # Buffer early handshake packets if packet logging enabled but session
+        # not initialised yet; bounded so a peer that never completes the
+        # handshake cannot grow the buffer without limit
+        self._early_packets = collections.deque(maxlen=1024)
+        # Coalesced packet_logged payloads, flushed to plugins every 100 ms
+        self._plugin_queue = []
+        self._plugin_flusher = None
+        # Live references into the connections tree, cached once per session
+        self._sensor_ref = None
+        self._session_ref = None
 
     def connection_made(self, end_ip, end_port, honey_ip, honey_port, sensor_name):
         plugin_list = plugins.get_plugin_list(plugin_type='output')
@@ -118,22 +328,33 @@ class Output(object):
             country = ''
 
         # Log incoming connection with country information to main terminal output
-        country_display = ' - ' + country if country else ''
-        log.msg(log.LCYAN, '[CONN]', 'Incoming Connection from %s:%s%s' % (self.end_ip, self.end_port, country_display))
+        if self._verbose:
+            country_display = ' - ' + country if country else ''
+            log.msg(log.LCYAN, '[CONN]',
+                    'Incoming Connection from %s:%s%s' % (self.end_ip, self.end_port, country_display))
 
         session = self.connections.add_session(self.sensor_name, self.end_ip, self.end_port, dt, self.honey_ip,
                                                self.honey_port, self.session_id, self.logLocation, country)
+        # Resolve the session once - _log_packet reads these refs per packet
+        # instead of walking the connections tree every time
+        self._sensor_ref, self._session_ref = self.connections.get_session(self.session_id)
         plugins.run_plugins_function(self.loaded_plugins, 'connection_made', True, session)
 
         # Flush any early buffered packets (e.g. KEX, SERVICE_REQUEST) captured before session init
-        if self._early_packets:
-            for ep in self._early_packets:
-                self._log_packet(*ep)
-            self._early_packets.clear()
+        while self._early_packets:
+            self._log_packet(*self._early_packets.popleft())
+
+        self._plugin_flusher = task.LoopingCall(self._flush_plugin_queue)
+        self._plugin_flusher.start(0.1, now=False)
 
     def connection_lost(self):
         log.msg(log.LRED, '[OUTPUT]', 'Lost Connection with the attacker: %s' % self.end_ip)
 
+        # Push out any coalesced packets before the session-close events
+        if self._plugin_flusher is not None and self._plugin_flusher.running:
+            self._plugin_flusher.stop()
+        self._flush_plugin_queue()
+
         dt = self.get_date_time()
 
         channels = self.connections.get_channels(self.session_id)
@@ -145,6 +366,8 @@ class Output(object):
         session = self.connections.set_session_close(self.session_id, dt)
         plugins.run_plugins_function(self.loaded_plugins, 'connection_lost', True, session)
         self.connections.del_session(self.session_id)
+        self._sensor_ref = None
+        self._session_ref = None
 
     def set_version(self, version):
         session = self.connections.set_client(self.session_id, version)
@@ -168,11 +391,12 @@ class Output(object):
         command = self.connections.add_command(channel_id, dt, the_command, blocked)
         plugins.run_plugins_function(self.loaded_plugins, 'command_entered', True, command)
 
-        the_commands_split = re.findall(r'(?:[^;&|<>()"\']|["\'](?:\\.|[^"\'])*[\'"])+', the_command)
-        the_commands = []
+        # Only the wget handling below needs tokenization - skip all regex
+        # work for the overwhelming majority of commands
+        if 'wget ' not in the_command or not self.cfg.getboolean(['download', 'active']):
+            return
 
-        for command in the_commands_split:
-            the_commands.extend(command.split('\n'))
+        the_commands = _CMD_SPLIT_RE.findall(the_command)
 
         for command in the_commands:
             command = command.strip().rstrip()
@@ -180,50 +404,12 @@ class Output(object):
             if self.cfg.getboolean(['download', 'active']):
                 if command.startswith('wget '):
                     command = command[4:]
-                    command_args = re.findall(r'(?:[^\s"]|"(?:\\.|[^"])*")+', command)
-                    args, links = getopt.getopt(command_args,
-                                                'VhbdqvFcNS46xErkKmpHLnp:e:o:a:i:B:t:O:T:w:Q:P:U:l:A:R:D:I:X:',
-                                                ['version', 'help', 'background', 'execute=', 'output-file=',
-                                                 'append-output=', 'debug', 'quiet', 'verbose', 'report-speed=',
-                                                 'input-file=', 'force-html', 'base=', 'config=', 'bind-address=',
-                                                 'tries=', 'output-document=', 'backups=', 'continue', 'progress=',
-                                                 'timestamping', 'no-use-server-timestamps', 'server-response',
-                                                 'spider', 'timeout=', 'dns-timeout=', 'connect-timeout=',
-                                                 'read-timeout=', 'limit-rate=', 'wait=', 'waitretry=', 'random-wait',
-                                                 'no-proxy', 'quota=', 'no-dns-cache', 'restrict-file-names=',
-                                                 'inet4-only', 'inet6-only', 'prefer-family=', 'retry-connrefused',
-                                                 'user=', 'password=', 'ask-password', 'no-iri', 'local-encoding=',
-                                                 'remote-encoding=', 'unlink', 'force-directories',
-                                                 'protocol-directories', 'cut-dirs=', 'directory-prefix=',
-                                                 'default-page=', 'adjust-extension', 'http-user=', 'http-password=',
-                                                 'no-http-keep-alive', 'no-cache', 'no-cookies', 'load-cookies=',
-                                                 'save-cookies=', 'keep-session-cookies', 'ignore-length', 'header=',
-                                                 'max-redirect=', 'proxy-user=', 'proxy-password=', 'referer=',
-                                                 'save-headers', 'user-agent=', 'post-data=', 'post-file=', 'method=',
-                                                 'body-data=', 'body-file=', 'content-disposition', 'content-on-error',
-                                                 'trust-server-names', 'auth-no-challenge', 'secure-protocol=',
-                                                 'https-only', 'no-check-certificate', 'certificate=',
-                                                 'certificate-type=', 'private-key=', 'private-key-type=',
-                                                 'ca-certificate=', 'ca-directory=', 'random-file=', 'egd-file=',
-                                                 'warc-file=', 'warc-header=', 'warc-max-size=', 'warc-cdx',
-                                                 'warc-dedup=', 'no-warc-compression', 'no-warc-digests',
-                                                 'no-warc-keep-log', 'warc-tempdir=', 'ftp-user=', 'ftp-password=',
-                                                 'no-remove-listing', 'no-glob', 'no-passive-ftp',
-                                                 'preserve-permissions', 'retr-symlinks', 'recursive', 'level=',
-                                                 'delete-after', 'convert-links', 'backup-converted', 'mirror',
-                                                 'page-requisites', 'strict-comments', 'accept=', 'reject=',
-                                                 'accept-regex=', 'reject-regex=', 'regex-type=', 'domains=',
-                                                 'exclude-domains=', 'follow-ftp', 'follow-tags=', 'ignore-tags=',
-                                                 'ignore-case', 'span-hosts', 'relative', 'include-directories=',
-                                                 'exclude-directories=', 'no-verbose', 'no-clobber', 'no-directories',
-                                                 'no-host-directories', 'no-parent'])
-                    username = ''
-                    password = ''
-                    for a in args:
-                        if a[0] in ['--user', '--http-user', '--ftp-user']:
-                            username = a[1]
-                        if a[0] in ['--password', '--http-password', '--ftp-password']:
-                            password = a[1]
+                    command_args = _WGET_ARG_RE.findall(command)
+                    args, links = getopt.getopt(command_args, _WGET_SHORT, _WGET_LONG)
+                    flags = dict(args)
+                    username = flags.get('--user') or flags.get('--http-user') or flags.get('--ftp-user') or ''
+                    password = (flags.get('--password') or flags.get('--http-password')
+                                or flags.get('--ftp-password') or '')
 
                     for l in links:
                         self.active_download(channel_id, l, username, password)
@@ -233,7 +419,7 @@ class Output(object):
 
         self.make_downloads_folder()
 
-        filename = dt + "-" + link.split("/")[-1]
+        filename = dt + "-" + link.rpartition("/")[2]
         file_out = self.downloadFolder + filename
 
         # Only prepend a default scheme if the link lacks any known scheme
@@ -241,7 +427,7 @@ class Output(object):
             link = 'http://' + link
 
         d = threads.deferToThread(self.download_file, channel_id, link, file_out, user, password)
-        d.addCallback(self.file_downloaded)
+        d.addCallback(self._finish_download)
 
         self.download_started(channel_id, link)
 
@@ -251,30 +437,26 @@ class Output(object):
         plugins.run_plugins_function(self.loaded_plugins, 'download_started', True, download)
 
     def file_downloaded(self, download):
-        finished = False
-        file_meta = ''
-
-        if len(download) == 3:
-            finished = download[1]
-            file_meta = download[2]
-            download = download[0]
-        else:
-            error = download[4]
-
-        if finished:
-            if file_meta != '':
-                dt = self.get_date_time()
-                channel_id, success, link, file, error = download
-
-                download = self.connections.set_download_close(channel_id, dt, link, file, success, file_meta[0],
-                                                               file_meta[1])
-                plugins.run_plugins_function(self.loaded_plugins, 'download_finished', True, download)
-        else:
-            if error:
-                log.msg(log.LRED, '[OUTPUT]', download)
-            else:
-                d = threads.deferToThread(self.get_file_meta, download)
-                d.addCallback(self.file_downloaded)
+        """Entry point for files captured outside the wget path (SFTP and
+        exec transfers hand over a bare 5-tuple with no metadata): hash the
+        file off-thread, then finish."""
+        if download[1]:
+            d = threads.deferToThread(self.get_file_meta, download)
+            d.addCallback(self._finish_download)
+        elif download[4]:
+            log.msg(log.LRED, '[OUTPUT]', download)
+
+    def _finish_download(self, result):
+        download, _, file_meta = result
+        channel_id, success, link, file, error = download
+
+        if success and file_meta != '':
+            dt = self.get_date_time()
+            download = self.connections.set_download_close(channel_id, dt, link, file, success, file_meta[0],
+                                                           file_meta[1])
+            plugins.run_plugins_function(self.loaded_plugins, 'download_finished', True, download)
+        elif error:
+            log.msg(log.LRED, '[OUTPUT]', download)
 
     def channel_opened(self, channel_id, channel_name):
         dt = self.get_date_time()
@@ -301,13 +483,24 @@ class Output(object):
         try:
             dt = self.get_date_time()
             self.make_session_folder()
-            sensor, session = self.connections.get_session(self.session_id)
+            sensor = self._sensor_ref
+            session = self._session_ref
             if not sensor or not session:
                 return
-            session_copy = self.connections.return_session(sensor, session)
-            session_copy['session']['packet'] = {'date_time': dt, 'direction': direction, 'packet': packet,
-                                                 'payload': payload}
-            plugins.run_plugins_function(self.loaded_plugins, 'packet_logged', True, session_copy)
+            # Shallow envelope in place of return_session's per-packet deep
+            # copy: the fields plugins read from it (sensor name,
+            # log_location, start_time) never change mid-session, and the
+            # batch dispatcher deep-copies once per plugin at flush time, so
+            # plugins still get isolated data
+            envelope = {key: value for key, value in sensor.items() if key != 'sessions'}
+            session_view = dict(session)
+            session_view['packet'] = {'date_time': dt, 'direction': direction, 'packet': packet,
+                                      'payload': payload}
+            envelope['session'] = session_view
+            # Queue instead of dispatching: under packet logging every SSH
+            # message costs a threadpool submission per plugin, so coalesce
+            # and let the 100 ms flusher batch them
+            self._plugin_queue.append(envelope)
         except (KeyError, AttributeError, TypeError) as ex:
             try:
                 log.msg(log.LRED, '[OUTPUT]', f'Error logging packet: {ex}')
@@ -315,82 +508,99 @@ class Output(object):
                 # If logging fails, silently continue
                 pass
 
+    def _flush_plugin_queue(self):
+        if not self._plugin_queue:
+            return
+        batch = self._plugin_queue
+        self._plugin_queue = []
+        plugins.run_plugins_function_batch(self.loaded_plugins, 'packet_logged', batch)
+
     def open_tty(self, uuid, ttylog_file):
         self.connections.add_ttylog_file(uuid, ttylog_file)
         ttylog.ttylog_open(ttylog_file, time.time())
 
+    def _write_tty(self, ttylog_file, record_type, data):
+        # data is always bytes: Term normalises its payload up front,
+        # Term.inject encodes once, and ExecTerm encodes at its call sites -
+        # so no per-keystroke type check here
+        _ttylog_submit(ttylog_file, record_type, time.time(), data)
+
     def input_tty(self, ttylog_file, data):
-        if isinstance(data, str):
-            # Preserve 1:1 byte values using latin1
-            data_bytes = data.encode('latin1', 'ignore')
-        else:
-            data_bytes = data
-        ttylog.ttylog_write(ttylog_file, len(data_bytes), ttylog.TYPE_INPUT, time.time(), data_bytes)
+        self._write_tty(ttylog_file, ttylog.TYPE_INPUT, data)
 
     def output_tty(self, ttylog_file, data):
-        if isinstance(data, str):
-            data_bytes = data.encode('latin1', 'ignore')
-        else:
-            data_bytes = data
-        ttylog.ttylog_write(ttylog_file, len(data_bytes), ttylog.TYPE_OUTPUT, time.time(), data_bytes)
+        self._write_tty(ttylog_file, ttylog.TYPE_OUTPUT, data)
 
     def interact_tty(self, ttylog_file, data):
-        if isinstance(data, str):
-            data_bytes = data.encode('latin1', 'ignore')
-        else:
-            data_bytes = data
-        ttylog.ttylog_write(ttylog_file, len(data_bytes), ttylog.TYPE_INTERACT, time.time(), data_bytes)
+        self._write_tty(ttylog_file, ttylog.TYPE_INTERACT, data)
 
     def close_tty(self, ttylog_file):
+        # Drain any queued records for this file before writing the close marker
+        _ttylog_writer.flush(ttylog_file)
         ttylog.ttylog_close(ttylog_file, time.time())
 
     def port_forward_log(self, channel_name, conn_details):
-        the_dns = ''
-        try:
-            the_dns = ' (' + socket.gethostbyaddr(conn_details['srcIP'])[0] + ')'
-        except (socket.herror, socket.gaierror, OSError) as e:
-            log.msg(log.LBLUE, '[OUTPUT]', 'DNS lookup failed for %s: %s' % (conn_details['srcIP'], str(e)))
-        log.msg(log.LPURPLE, '[OUTPUT]',
-                channel_name + ' Source: ' + conn_details['srcIP'] + ':' + str(conn_details['srcPort']) + the_dns)
+        self._log_forward_endpoint(channel_name, 'Source', conn_details['srcIP'], conn_details['srcPort'])
+        self._log_forward_endpoint(channel_name, 'Destination', conn_details['dstIP'], conn_details['dstPort'])
 
+    def _log_forward_endpoint(self, channel_name, label, ip, port):
         the_dns = ''
         try:
-            the_dns = ' (' + socket.gethostbyaddr(conn_details['dstIP'])[0] + ')'
+            the_dns = ' (' + socket.gethostbyaddr(ip)[0] + ')'
         except (socket.herror, socket.gaierror, OSError) as e:
-            log.msg(log.LBLUE, '[OUTPUT]', 'DNS lookup failed for %s: %s' % (conn_details['dstIP'], str(e)))
-        log.msg(log.LPURPLE, '[OUTPUT]',
-                channel_name + ' Destination: ' + conn_details['dstIP'] + ':' + str(conn_details['dstPort']) + the_dns)
+            # Failed reverse lookups are routine for attacker IPs - only
+            # format the diagnostic when devmode will actually emit it
+            if self._debug:
+                log.msg(log.LBLUE, '[OUTPUT][DEBUG]', 'DNS lookup failed for %s: %s' % (ip, str(e)))
+        log.msg(log.LPURPLE, '[OUTPUT]', '%s %s: %s:%s%s' % (channel_name, label, ip, port, the_dns))
 
     def make_session_folder(self):
-        if not os.path.exists(self.logLocation):
-            os.makedirs(self.logLocation)
-            os.chmod(self.logLocation, 0o755)
-            os.chmod('/'.join(self.logLocation.split('/')[:-2]), 0o755)
+        # Called per logged packet - once the folder exists, skip the stat
+        # syscall entirely. exist_ok also removes the check-then-create race.
+        if self._session_folder_made:
+            return
+        os.makedirs(self.logLocation, exist_ok=True)
+        os.chmod(self.logLocation, 0o755)
+        os.chmod('/'.join(self.logLocation.split('/')[:-2]), 0o755)
+        self._session_folder_made = True
 
     def make_downloads_folder(self):
-        if not os.path.exists(self.downloadFolder):
-            os.makedirs(self.downloadFolder)
-            os.chmod(self.downloadFolder, 0o755)
+        if self._downloads_folder_made:
+            return
+        os.makedirs(self.downloadFolder, exist_ok=True)
+        os.chmod(self.downloadFolder, 0o755)
+        self._downloads_folder_made = True
 
     def get_file_meta(self, download):
         channel_id, success, link, the_file, error = download
         if success:
-            f = open(the_file, 'rb')
-            sha256 = hashlib.sha256()
-            while True:
-                data = f.read(2 ** 20)
-                if not data:
-                    break
-                sha256.update(data)
-            f.close()
+            with open(the_file, 'rb') as f:
+                if hasattr(hashlib, 'file_digest'):
+                    # Python 3.11+: zero-copy hashing in C, no Python-level
+                    # read loop
+                    sha256 = hashlib.file_digest(f, 'sha256')
+                else:
+                    sha256 = hashlib.sha256()
+                    while True:
+                        data = f.read(2 ** 20)
+                        if not data:
+                            break
+                        sha256.update(data)
 
             sha256_hash = sha256.hexdigest()
-            file_size = os.path.getsize(the_file)
+            file_size = os.stat(the_file).st_size
             return download, True, [sha256_hash, file_size]
         else:
             return download, True, ''
 
     def download_file(self, channel_id, link, file_out, user, password):
+        # Bound concurrency so a scripted flood of wget commands queues here
+        # instead of tying up every Twisted threadpool worker on slow or
+        # stalled transfers
+        with _download_sem:
+            return self._download_file(channel_id, link, file_out, user, password)
+
+    def _download_file(self, channel_id, link, file_out, user, password):
         response = False
         error = ''
         try:
@@ -406,15 +616,7 @@ class Output(object):
                 link = fixed
             request = urllib.request.Request(link)
             request.add_header('Accept', 'text/plain')
-            ua_cfg = ''
-            try:
-                if self.cfg.has_option('download', 'user_agent'):
-                    ua_cfg = self.cfg.get(['download', 'user_agent'])
-            except (AttributeError, KeyError):
-                log.msg(log.LBLUE, '[OUTPUT]', 'Failed to get user_agent config, using default')
-            if not ua_cfg:
-                ua_cfg = 'Wget/1.21.1'
-            request.add_header('User-Agent', ua_cfg)
+            request.add_header('User-Agent', self._user_agent)
             if user and password:
                 if link.startswith('ftp://'):
                     link = link[:6] + user + ':' + password + '@' + link[6:]
@@ -423,22 +625,31 @@ class Output(object):
                     import base64 as _b64
                     base64string = _b64.b64encode(('%s:%s' % (user, password)).encode()).decode()
                     request.add_header("Authorization", "Basic %s" % base64string)
-            response = urllib.request.urlopen(request)  # type: ignore
+            response = urllib.request.urlopen(request, timeout=15)  # type: ignore
         except (urllib.error.URLError, urllib.error.HTTPError, OSError, ValueError) as ex:
             error = str(ex)
             log.msg(log.LRED, '[OUTPUT]', f'Failed to download file from {link}: {error}')
 
         if response:
-            the_file = response.read()
-            f = open(file_out, 'wb')
-            f.write(the_file)
-            f.close()
-            return channel_id, True, link, file_out, None
+            # Stream to disk in 1 MiB chunks and hash in the same pass:
+            # peak memory stays O(chunk) instead of O(filesize) and the
+            # file is only read once, so no separate metadata sweep
+            sha256 = hashlib.sha256()
+            file_size = 0
+            with open(file_out, 'wb') as f:
+                while True:
+                    chunk = response.read(1 << 20)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    sha256.update(chunk)
+                    file_size += len(chunk)
+            return (channel_id, True, link, file_out, None), True, [sha256.hexdigest(), file_size]
         else:
-            return channel_id, False, link, None, error
+            return (channel_id, False, link, None, error), False, ''
 
     def get_date_time(self):
-        return datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        return _get_date_time()
 
     def register_self(self, register):
         sensor, session, channel = self.connections.get_channel(register.uuid)
@@ -453,11 +664,4 @@ class Output(object):
                 log.msg(log.LYELLOW, '[OUTPUT]', 'GeoIP support not available - country lookups disabled')
                 _geoip_notice_logged = True
             return ''
-        try:
-            # Legacy API
-            if hasattr(_geoip_obj, 'country_name_by_addr'):
-                return _geoip_obj.country_name_by_addr(ipv4_str) or ''
-        except (ValueError, TypeError, AttributeError):
-            # Invalid IP or GeoIP lookup error
-            return ''
-        return ''
+        return _cname_cached(ipv4_str)
@@ -55,7 +55,7 @@ class ExecTerm(baseProtocol.BaseProtocol):
             self.ttylog_file = self.out.logLocation + datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f") \
                                + '_' + self.name[1:-1] + '.tty'
             self.out.open_tty(self.uuid, self.ttylog_file)
-            self.out.input_tty(self.ttylog_file, 'INPUT: ' + command + '\n\n')
+            self.out.input_tty(self.ttylog_file, ('INPUT: ' + command + '\n\n').encode('latin1', 'ignore'))
 
         self.out.command_entered(self.uuid, command, blocked=blocked)
 
@@ -92,4 +92,7 @@ class ExecTerm(baseProtocol.BaseProtocol):
                         self.file = ''
                         self.size = -1
         else:
+            # input_tty expects bytes; exec payloads may arrive as str
+            if isinstance(payload, str):
+                payload = payload.encode('latin1', 'ignore')
             self.out.input_tty(self.ttylog_file, payload)
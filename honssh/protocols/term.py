@@ -27,15 +27,38 @@
 # SUCH DAMAGE.
 
 from honssh import log
-from honssh.protocols import baseProtocol 
+from honssh.protocols import baseProtocol
 import datetime
 
+# Action codes for the [SERVER] parse loop. Two dict probes replace the
+# chain of escape-sequence comparisons that previously had to fail one by
+# one for every ordinary character.
+_TAB, _BS, _ENTER, _CTRLC, _HOME, _END, _RIGHT, _LEFT, _UPDOWN = range(9)
+
+_ONE = {
+    0x09: _TAB,
+    0x7f: _BS,
+    0x08: _BS,
+    0x0d: _ENTER,
+    0x0a: _ENTER,
+    0x03: _CTRLC,
+}
+
+_ESC3 = {
+    b'\x1b\x4f\x48': _HOME,
+    b'\x1b\x4f\x46': _END,
+    b'\x1b\x5b\x43': _RIGHT,
+    b'\x1b\x5b\x44': _LEFT,
+    b'\x1b\x5b\x41': _UPDOWN,
+    b'\x1b\x5b\x42': _UPDOWN,
+}
+
 
 class Term(baseProtocol.BaseProtocol):
     def __init__(self, out, uuid, chan_name, ssh, client_id):
         super(Term, self).__init__(uuid, chan_name, ssh)
 
-        self.command = ''
+        self.command = bytearray()
         self.pointer = 0
         self.tabPress = False
         self.upArrow = False
@@ -54,105 +77,121 @@ class Term(baseProtocol.BaseProtocol):
             i.transport.loseConnection()
     
     def parse_packet(self, parent, payload):
-        # Ensure payload stored as bytes for logging; keep a working string view for command parsing
+        # Keep the payload as bytes end to end: an index cursor over the raw
+        # buffer with integer byte comparisons replaces the old per-character
+        # str slicing, which reallocated the whole remainder on every step
+        # (O(N^2) on long pastes) and needed a latin1 decode up front.
         raw = payload if isinstance(payload, (bytes, bytearray)) else payload.encode('utf-8', 'ignore')
         self.data = raw
-        # Working text (single-byte control assumptions) decoded latin1 to preserve byte values 0x00-0xff
-        work = raw.decode('latin1', 'ignore')
-         
+
         if parent == '[SERVER]':
             # Log raw bytes to TTY file as INPUT
             self.out.input_tty(self.ttylog_file, self.data)
 
-            while len(work) > 0:
-                # If Tab Pressed
-                if work[:1] == '\x09':
-                    self.tabPress = True 
-                    work = work[1:]
-                # If Backspace Pressed
-                elif work[:1] == '\x7f' or work[:1] == '\x08':
-                    if self.pointer > 0:
-                        self.command = self.command[:self.pointer-1] + self.command[self.pointer:]
-                        self.pointer -= 1
-                    work = work[1:]
-                # If enter or ctrl+c or newline
-                elif work[:1] == '\x0d' or work[:1] == '\x03' or work[:1] == '\x0a':
-                    if work[:1] == '\x03':
-                        self.command += "^C"
-                    work = work[1:]
-                    if self.command != '':
-                        log.msg(log.LPURPLE, '[TERM]', 'Entered command: %s' % self.command)
-                        self.out.command_entered(self.uuid, self.command)
-                    
-                    self.command = ''
-                    self.pointer = 0
-                # If Home Pressed
-                elif work[:3] == '\x1b\x4f\x48':
-                    self.pointer = 0
-                    work = work[3:]
-                # If End Pressed
-                elif work[:3] == '\x1b\x4f\x46':
-                    self.pointer = len(self.command)
-                    work = work[3:]
-                # If Right Pressed
-                elif work[:3] == '\x1b\x5b\x43':
-                    if self.pointer != len(self.command):
-                        self.pointer += 1
-                    work = work[3:]
-                # If Left Pressed
-                elif work[:3] == '\x1b\x5b\x44':
-                    if self.pointer != 0:
-                        self.pointer -= 1
-                    work = work[3:]
-                # If up or down arrow
-                elif work[:3] == '\x1b\x5b\x41' or work[:3] == '\x1b\x5b\x42':
-                    self.upArrow = True
-                    work = work[3:]
-                else:                   
-                    self.command = self.command[:self.pointer] + work[:1] + self.command[self.pointer:]
-                    self.pointer += 1
-                    work = work[1:]
-        
+            # bytes, not bytearray: slices feed the _ESC3 dict probe, so
+            # they must be hashable
+            buf = raw if type(raw) is bytes else bytes(raw)
+            command = self.command
+            i = 0
+            n = len(buf)
+            while i < n:
+                b = buf[i]
+                action = _ONE.get(b)
+                if action is not None:
+                    if action == _TAB:
+                        self.tabPress = True
+                    elif action == _BS:
+                        if self.pointer > 0:
+                            # pointer can run past the buffer via the
+                            # [CLIENT] echo handling (e.g. BEL after an
+                            # up-arrow); the old slice code was a no-op
+                            # then, so only delete when in range
+                            if self.pointer <= len(command):
+                                del command[self.pointer - 1]
+                            self.pointer -= 1
+                    else:
+                        # Enter, newline or ctrl+c all flush the command line
+                        if action == _CTRLC:
+                            command += b'^C'
+                        if command:
+                            entered = command.decode('latin1')
+                            log.msg(log.LPURPLE, '[TERM]', 'Entered command: %s' % entered)
+                            self.out.command_entered(self.uuid, entered)
+
+                        del command[:]
+                        self.pointer = 0
+                    i += 1
+                    continue
+
+                if b == 0x1b:
+                    # A truncated sequence misses the table and falls through
+                    # to the insert path, matching the old comparison chain
+                    action = _ESC3.get(buf[i:i + 3])
+                    if action is not None:
+                        if action == _HOME:
+                            self.pointer = 0
+                        elif action == _END:
+                            self.pointer = len(command)
+                        elif action == _RIGHT:
+                            if self.pointer != len(command):
+                                self.pointer += 1
+                        elif action == _LEFT:
+                            if self.pointer != 0:
+                                self.pointer -= 1
+                        else:
+                            self.upArrow = True
+                        i += 3
+                        continue
+
+                command[self.pointer:self.pointer] = buf[i:i + 1]
+                self.pointer += 1
+                i += 1
+
         elif parent == '[CLIENT]':
             # Log raw bytes to TTY file as OUTPUT
             self.out.output_tty(self.ttylog_file, self.data)
-            for i in self.interactors:
-                i.sendKeystroke(self.data)
-            
+            for interactor in self.interactors:
+                interactor.sendKeystroke(self.data)
+
             if self.tabPress:
-                if not work.startswith('\x0d'):
-                    if work != '\x07':
-                        self.command = self.command + work
+                if not raw.startswith(b'\x0d'):
+                    if raw != b'\x07':
+                        self.command += raw
                 self.tabPress = False
 
             if self.upArrow:
-                while len(work) != 0:
+                buf = raw
+                command = self.command
+                i = 0
+                n = len(buf)
+                while i < n:
+                    b = buf[i]
                     # Backspace
-                    if work[:1] == '\x08':
-                        self.command = self.command[:-1]
+                    if b == 0x08:
+                        del command[-1:]
                         self.pointer -= 1
-                        work = work[1:]
-                    # ESC[K - Clear Line
-                    elif work[:3] == '\x1b\x5b\x4b':
-                        self.command = self.command[:self.pointer]
-                        work = work[3:]
-                    elif work[:1] == '\x0d':
+                        i += 1
+                    elif b == 0x1b and i + 2 < n and buf[i + 1] == 0x5b and buf[i + 2] == 0x4b:
+                        # ESC[K - Clear Line
+                        del command[self.pointer:]
+                        i += 3
+                    elif b == 0x0d:
                         self.pointer = 0
-                        work = work[1:]
-                    # Right Arrow
-                    elif work[:3] == '\x1b\x5b\x43':
+                        i += 1
+                    elif b == 0x1b and i + 2 < n and buf[i + 1] == 0x5b and buf[i + 2] == 0x43:
+                        # Right Arrow
                         self.pointer += 1
-                        work = work[3:]
-                    elif work[:2] == '\x1b\x5b' and work[3] == '\x50':
-                        work = work[4:]
+                        i += 3
+                    elif b == 0x1b and i + 3 < n and buf[i + 1] == 0x5b and buf[i + 3] == 0x50:
+                        i += 4
                     # Needed?!
-                    elif work[:1] != '\x07' and work[:1] != '\x0d':
-                        self.command = self.command[:self.pointer] + work[:1] + self.command[self.pointer:]
+                    elif b != 0x07:
+                        command[self.pointer:self.pointer] = buf[i:i + 1]
                         self.pointer += 1
-                        work = work[1:]
+                        i += 1
                     else:
                         self.pointer += 1
-                        work = work[1:]
+                        i += 1
 
                 self.upArrow = False
             
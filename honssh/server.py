@@ -204,7 +204,9 @@ class HonsshServerFactory(factory.SSHFactory):
         self.otherVersionString = ''
         self.connections = connections.Connections()
         self.plugin_servers = []
-        self.ourVersionString = self.cfg.get(['honeypot', 'ssh_banner'])
+        # Encoded once here - buildProtocol hands the same bytes to every
+        # connection, so the transport no longer re-encodes per connect
+        self.ourVersionString = self.cfg.get(['honeypot', 'ssh_banner']).encode('utf-8')
 
         if len(self.ourVersionString) > 0:
             banner_disp = self.ourVersionString.decode() if isinstance(self.ourVersionString, (bytes, bytearray)) else self.ourVersionString
@@ -227,7 +229,7 @@ class HonsshServerFactory(factory.SSHFactory):
             plugin_name = plugins.get_plugin_name(plugin)
             self.plugin_servers.append({'name': plugin_name, 'server': plugin_server})
 
-        if self.ourVersionString != '':
+        if len(self.ourVersionString) > 0:
             log.msg(log.LGREEN, '[HONSSH]', 'HonSSH Boot Sequence Complete - Ready for attacks!')
 
     def buildProtocol(self, addr):
@@ -109,7 +109,11 @@ class HonsshProtocol(protocol.Protocol):
         count = len(datagrams) // 3
         for i in range(count):
             datagram = datagrams[3 * i:(3 * i) + 3]
-            if len(datagram) == 3 and datagram[0] == 'honssh' and datagram[1] == 's':
+            if len(datagram) == 3 and datagram[0] == 'honssh' and datagram[1] == 'k':
+                # Raw terminal bytes from the honeypot - straight to stdout
+                sys.stdout.buffer.write(base64.b64decode(datagram[2]))
+                sys.stdout.flush()
+            elif len(datagram) == 3 and datagram[0] == 'honssh' and datagram[1] == 's':
                 self.theData = datagram[2]
                 self.lastRawBase64 = self.theData  # store for debug
                 self.parsePacket()
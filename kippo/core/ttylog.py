@@ -28,29 +28,50 @@
 
 # Should be compatible with user mode Linux
 
-import struct, os
+import struct, os, threading
 
 OP_OPEN, OP_CLOSE, OP_WRITE, OP_EXEC = 1, 2, 3, 4
 TYPE_INPUT, TYPE_OUTPUT, TYPE_INTERACT = 1, 2, 3
 
+# Persistent descriptor per open tty log. Every record used to pay an
+# open/close syscall pair around its write; the files are append-only for
+# their whole life, so keep one O_APPEND fd from ttylog_open until
+# ttylog_close and write records with a single os.write each.
+_fd_cache = {}
+_fd_lock = threading.Lock()
+
+def _get_fd(logfile):
+    fd = _fd_cache.get(logfile)
+    if fd is None:
+        with _fd_lock:
+            fd = _fd_cache.get(logfile)
+            if fd is None:
+                fd = os.open(logfile, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                _fd_cache[logfile] = fd
+    return fd
+
+def _peek_fd(logfile):
+    # Non-creating lookup: returns None once ttylog_close has run. Writers
+    # that may race the close (e.g. a drain after a flush timeout) must use
+    # this instead of _get_fd, or they silently reopen a finished log and
+    # cache an fd nothing ever closes.
+    return _fd_cache.get(logfile)
+
 def ttylog_write(logfile, len, direction, stamp, data = None):
-    f = open(logfile, 'ab')
     sec, usec = int(stamp), int(1000000 * (stamp - int(stamp)))
-    f.write(struct.pack('<iLiiLL', 3, 0, len, direction, sec, usec))
-    f.write(data)
-    f.close()
+    os.write(_get_fd(logfile), struct.pack('<iLiiLL', 3, 0, len, direction, sec, usec) + data)
 
 def ttylog_open(logfile, stamp):
-    f = open(logfile, 'ab')
     sec, usec = int(stamp), int(1000000 * (stamp - int(stamp)))
-    f.write(struct.pack('<iLiiLL', 1, 0, 0, 0, sec, usec))
-    f.close()
-    
+    os.write(_get_fd(logfile), struct.pack('<iLiiLL', 1, 0, 0, 0, sec, usec))
+
     os.chmod(logfile, 0o644)
 
 def ttylog_close(logfile, stamp):
-    f = open(logfile, 'ab')
     sec, usec = int(stamp), int(1000000 * (stamp - int(stamp)))
-    f.write(struct.pack('<iLiiLL', 2, 0, 0, 0, sec, usec))
-    f.close()
+    fd = _get_fd(logfile)
+    os.write(fd, struct.pack('<iLiiLL', 2, 0, 0, 0, sec, usec))
+    with _fd_lock:
+        _fd_cache.pop(logfile, None)
+    os.close(fd)
 
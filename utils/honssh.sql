@@ -5,7 +5,10 @@ CREATE TABLE `auth` (
   `ip` VARCHAR(45) NOT NULL DEFAULT '',
   `country` VARCHAR(100) NOT NULL DEFAULT '',
   `timestamp` DATETIME NOT NULL,
-  PRIMARY KEY (`timestamp`, `password`, `username`, `success`)
+  `sessionid` CHAR(32) NULL DEFAULT NULL,
+  PRIMARY KEY (`timestamp`, `password`, `username`, `success`),
+  INDEX `ix_auth_success_ts` (`success`, `timestamp`),
+  INDEX `ix_auth_sessionid` (`sessionid`)
 ) ;
 
 CREATE TABLE `clients` (
@@ -31,7 +34,8 @@ CREATE TABLE `sessions` (
   `client` INT(4) NULL DEFAULT NULL,
   `port` INT(6) NOT NULL,
   PRIMARY KEY (`id`),
-  INDEX `starttime` (`starttime`, `sensor`)
+  INDEX `starttime` (`starttime`, `sensor`),
+  INDEX `ix_sessions_ip` (`ip`)
 ) ;
 
 CREATE TABLE `ttylog` (
@@ -48,7 +52,8 @@ CREATE TABLE `downloads` (
   `url` TEXT NOT NULL,
   `outfile` TEXT NOT NULL,
   PRIMARY KEY (`id`),
-  INDEX `session` (`channelid`, `timestamp`)
+  INDEX `session` (`channelid`, `timestamp`),
+  INDEX `ix_downloads_ts` (`timestamp`)
 ) ;
 
 CREATE TABLE `channels` (
@@ -57,12 +62,27 @@ CREATE TABLE `channels` (
   `starttime` DATETIME NOT NULL,
   `endtime` DATETIME NULL,
   `sessionid` CHAR(32) NOT NULL,
-  PRIMARY KEY (`id`)
+  PRIMARY KEY (`id`),
+  INDEX `ix_channels_sessionid` (`sessionid`)
 ) ;
 
 CREATE TABLE `commands` (
   `timestamp` DATETIME NOT NULL,
   `channelid` CHAR(32) NOT NULL,
   `command` VARCHAR(240) NOT NULL,
-  PRIMARY KEY (`timestamp`, `command`)
+  PRIMARY KEY (`timestamp`, `command`),
+  INDEX `ix_commands_channelid` (`channelid`)
+) ;
+
+CREATE TABLE `auth_hourly` (
+  `hour_start` DATETIME NOT NULL,
+  `attempts` INT(11) NOT NULL DEFAULT 0,
+  `successes` INT(11) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`hour_start`)
+) ;
+
+CREATE TABLE `sessions_hourly` (
+  `hour_start` DATETIME NOT NULL,
+  `sessions` INT(11) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`hour_start`)
 ) ;